@@ -0,0 +1,36 @@
+"""
+_env.py - One-shot .env loader shared by the automation scripts.
+
+Replaces the per-line strip/startswith/split loop that was duplicated
+in github_uploader.py and upload_and_post_story.py with a single
+compiled-regex pass over the file.
+"""
+
+import os
+import re
+from functools import lru_cache
+
+# Matches KEY=value lines; comments and malformed lines simply don't
+# match instead of being filtered line-by-line in Python.
+PATTERN = re.compile(r'(?m)^([A-Z_][A-Z0-9_]*)=(.*)$')
+
+@lru_cache(maxsize=4)
+def _parse(path, mtime):
+    # mtime is part of the cache key so an edited .env is re-read, but
+    # repeated loads in one process cost nothing.
+    with open(path) as f:
+        return PATTERN.findall(f.read())
+
+def load_env(path):
+    """Load KEY=value pairs from a .env file into os.environ.
+
+    Variables already present in the environment are left alone, so
+    explicit exports win over the file. Missing files are ignored.
+    """
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return
+
+    for key, value in _parse(path, mtime):
+        os.environ.setdefault(key, value)
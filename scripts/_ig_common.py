@@ -0,0 +1,212 @@
+"""
+_ig_common.py - Shared helpers for the Instagram Graph API scripts.
+
+post_story.py and upload_and_post_story.py both need to wait for a
+media container to finish processing before publishing; the polling
+logic lives here so the two scripts don't drift apart.
+"""
+
+import json
+import os
+import time
+
+import requests
+
+# orjson decodes JSON faster than the stdlib; optional, stdlib fallback.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _json_loads(response):
+    return orjson.loads(response.content) if orjson else response.json()
+
+GRAPH_BASE_URL = "https://graph.facebook.com/v19.0"
+
+# Request-payload templates for the container create call, keyed by
+# (kind, media_type). 'url_key' names the field that carries the media
+# URL. The table replaces the if/elif blocks that had quietly diverged
+# between post_story.py (REELS shared to story) and
+# upload_and_post_story.py (native STORIES), and makes adding
+# CAROUSEL/REELS variants a one-line change.
+PAYLOAD_TEMPLATES = {
+    ('STORY', 'IMAGE'): {'media_type': 'STORIES', 'url_key': 'image_url'},
+    ('STORY', 'VIDEO'): {'media_type': 'STORIES', 'url_key': 'video_url'},
+    # Legacy share-to-story payloads used by post_story.py
+    ('REEL', 'IMAGE'): {'media_type': 'IMAGE', 'url_key': 'media_url',
+                        'is_share_to_story': True},
+    ('REEL', 'VIDEO'): {'media_type': 'REELS', 'url_key': 'video_url',
+                        'is_share_to_story': True},
+}
+
+def build_media_payload(kind, media_type, media_url):
+    """Build the POST /{ig-user}/media payload from the template table."""
+    template = PAYLOAD_TEMPLATES[(kind, media_type)]
+    data = {k: v for k, v in template.items() if k != 'url_key'}
+    data[template['url_key']] = media_url
+    return data
+
+# Token cache shared with exchange_token.py
+TOKEN_CACHE_PATH = os.path.expanduser("~/.cache/album3/ig_token.json")
+
+# Refresh the cached token when less than a week of validity remains.
+REFRESH_MARGIN = 7 * 86400
+
+def save_token_cache(access_token, expires_in):
+    """Persist the long-lived token with an absolute expiry timestamp.
+
+    A 5-minute safety margin is subtracted so callers never use a token
+    that is about to expire mid-request.
+    """
+    cache = {
+        'access_token': access_token,
+        'exp': time.time() + expires_in - 300
+    }
+
+    os.makedirs(os.path.dirname(TOKEN_CACHE_PATH), exist_ok=True)
+    with open(TOKEN_CACHE_PATH, 'w') as f:
+        json.dump(cache, f)
+    os.chmod(TOKEN_CACHE_PATH, 0o600)
+
+def exchange_token(existing_token, app_id, app_secret):
+    """Exchange a token for a fresh long-lived one and cache it.
+
+    Works for both the initial short-lived -> long-lived exchange and
+    for extending an ageing long-lived token. Returns the Graph
+    response dict, or None on failure.
+    """
+    params = {
+        'grant_type': 'fb_exchange_token',
+        'client_id': app_id,
+        'client_secret': app_secret,
+        'fb_exchange_token': existing_token
+    }
+
+    try:
+        response = requests.get(f"{GRAPH_BASE_URL}/oauth/access_token", params=params)
+        response.raise_for_status()
+        result = _json_loads(response)
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Token exchange request failed: {e}")
+        return None
+
+    if 'access_token' not in result:
+        print(f"❌ Token exchange error: {result}")
+        return None
+
+    if 'expires_in' in result:
+        save_token_cache(result['access_token'], result['expires_in'])
+    return result
+
+def load_token():
+    """Load the Instagram access token, preferring the on-disk cache.
+
+    When the cached token is within a week of expiry and FB_APP_ID /
+    FB_APP_SECRET are configured, it is transparently re-exchanged for
+    a fresh long-lived token first, so posting never trips over a
+    stale token. Falls back to the INSTAGRAM_ACCESS_TOKEN environment
+    variable when there is no usable cache.
+    """
+    try:
+        with open(TOKEN_CACHE_PATH) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    token = cache.get('access_token')
+    exp = cache.get('exp', 0)
+    now = time.time()
+
+    if token and exp > now:
+        app_id = os.getenv("FB_APP_ID")
+        app_secret = os.getenv("FB_APP_SECRET")
+        if exp - now < REFRESH_MARGIN and app_id and app_secret:
+            print("🔄 Cached Instagram token expires soon. Refreshing...")
+            result = exchange_token(token, app_id, app_secret)
+            if result:
+                return result['access_token']
+        return token
+
+    return os.getenv("INSTAGRAM_ACCESS_TOKEN")
+
+def graph_batch(session, access_token, ops):
+    """Execute several Graph API operations in one HTTP round-trip.
+
+    ops is a list of batch operation dicts (method/relative_url/body,
+    optionally name/depends_on for chained calls). Returns the list of
+    per-operation responses, or None on transport failure.
+    """
+    try:
+        response = session.post(GRAPH_BASE_URL + "/", data={
+            'access_token': access_token,
+            'batch': json.dumps(ops),
+            'include_headers': 'false'
+        })
+        response.raise_for_status()
+        return _json_loads(response)
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Graph batch request failed: {e}")
+        return None
+
+def _backoff(start=0.5, cap=5.0, timeout=120):
+    """Yield sleep intervals that grow exponentially from start to cap.
+
+    The generator stops once the accumulated sleep time would exceed
+    timeout, so callers can treat exhaustion as a hard timeout.
+    """
+    delay = start
+    elapsed = 0.0
+    while elapsed + delay <= timeout:
+        yield delay
+        elapsed += delay
+        delay = min(delay * 2, cap)
+
+def check_media_status(session, container_id, access_token, media_type=None):
+    """Poll a media container until it's ready for publishing.
+
+    Uses an iterative exponential-backoff loop (0.5s, 1s, 2s, 4s, 5s...)
+    instead of a fixed 5s interval, so short videos are picked up almost
+    immediately and long ones don't hammer the API. Returns True when
+    the container is ready, False on failure or timeout.
+    """
+    status_url = f"{GRAPH_BASE_URL}/{container_id}"
+
+    for delay in _backoff():
+        try:
+            response = session.get(status_url, params={
+                'access_token': access_token,
+                'fields': 'id,status_code'
+            })
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error checking media status: {e}")
+            return False
+
+        result = _json_loads(response)
+        status_code = result.get('status_code')
+
+        # For Stories with images, status_code might not be returned (immediate processing)
+        if status_code is None and media_type == 'IMAGE':
+            print("✅ Media is ready for publishing (Stories don't require status check).")
+            return True
+
+        if status_code == 'FINISHED':
+            print("✅ Media is ready for publishing.")
+            return True
+        elif status_code == 'IN_PROGRESS':
+            print("⏳ Media is still processing. Waiting...")
+            time.sleep(delay)
+            continue
+        elif status_code == 'FAILED':
+            print(f"❌ Media processing failed: {result}")
+            return False
+        else:
+            print(f"⚠️ Unknown status: {result}")
+            # For Stories, proceed anyway if we have an ID
+            if media_type is not None and 'id' in result:
+                print("✅ Proceeding with publication...")
+                return True
+            return False
+
+    print("❌ Timed out waiting for media processing to finish.")
+    return False
@@ -16,47 +16,28 @@ Requirements:
     - A short-lived token from Graph API Explorer
 """
 
-import requests
 import sys
 
+from _ig_common import TOKEN_CACHE_PATH, exchange_token as _exchange_token
+
 def exchange_token(short_lived_token, app_id, app_secret):
     """Exchange short-lived token for long-lived token"""
 
-    url = "https://graph.facebook.com/v19.0/oauth/access_token"
-
-    params = {
-        'grant_type': 'fb_exchange_token',
-        'client_id': app_id,
-        'client_secret': app_secret,
-        'fb_exchange_token': short_lived_token
-    }
-
-    try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-
-        result = response.json()
-
-        if 'access_token' in result:
-            print("\n✅ Successfully exchanged token!")
-            print(f"\n📋 Long-lived token (valid for ~60 days):")
-            print(f"{result['access_token']}\n")
+    result = _exchange_token(short_lived_token, app_id, app_secret)
+    if not result:
+        return None
 
-            if 'expires_in' in result:
-                days = result['expires_in'] / 86400
-                print(f"⏰ Expires in: {days:.0f} days\n")
+    print("\n✅ Successfully exchanged token!")
+    print(f"\n📋 Long-lived token (valid for ~60 days):")
+    print(f"{result['access_token']}\n")
 
-            print("💡 Add this to your .env file as INSTAGRAM_ACCESS_TOKEN")
-            return result['access_token']
-        else:
-            print(f"❌ Error: {result}")
-            return None
+    if 'expires_in' in result:
+        days = result['expires_in'] / 86400
+        print(f"⏰ Expires in: {days:.0f} days\n")
+        print(f"💾 Token cached at {TOKEN_CACHE_PATH}")
 
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Request failed: {e}")
-        if hasattr(e.response, 'text'):
-            print(f"   Response: {e.response.text}")
-        return None
+    print("💡 Add this to your .env file as INSTAGRAM_ACCESS_TOKEN")
+    return result['access_token']
 
 def main():
     print("\n🔄 Instagram Token Exchange Tool\n")
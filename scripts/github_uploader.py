@@ -19,25 +19,57 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
 venv_python = os.path.join(project_root, "venv", "bin", "python3")
 
-if os.path.exists(venv_python) and sys.executable != venv_python:
+# Only re-exec when we're genuinely outside any virtual environment:
+# sys.prefix == sys.base_prefix means no venv is active, and comparing
+# realpaths avoids a pointless exec when venv/bin/python3 is a symlink
+# to the interpreter already running. Each avoided exec saves a full
+# Python cold start (~100 ms).
+if (os.path.exists(venv_python)
+        and os.path.realpath(sys.executable) != os.path.realpath(venv_python)
+        and sys.prefix == sys.base_prefix):
     os.execv(venv_python, [venv_python] + sys.argv)
 
-# Now import the rest after venv is activated
-import subprocess
-import requests
-from pathlib import Path
-import base64
+# Now import the rest after venv is activated. requests (which drags
+# in urllib3, charset detection, idna...) is deferred to _get_session()
+# so importing this module for upload_to_github stays cheap until a
+# request is actually made.
 import json
+import mmap
+import stat
+import time
+import hashlib
+from urllib.parse import quote
+
+# fcntl guards the dedupe cache against concurrent invocations; not
+# available on Windows, where we just skip locking.
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# pybase64 is a SIMD-accelerated drop-in for stdlib base64 (~4-6x
+# faster on multi-MB buffers); fall back silently when the wheel isn't
+# installed.
+try:
+    from pybase64 import b64encode
+except ImportError:
+    from base64 import b64encode
+
+# orjson encodes/decodes JSON several times faster than the stdlib,
+# which matters for the base64-heavy upload body; also optional.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _json_loads(response):
+    return orjson.loads(response.content) if orjson else response.json()
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 # Load environment variables from .env file
-env_file = os.path.join(project_root, ".env")
-if os.path.exists(env_file):
-    with open(env_file) as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#') and '=' in line:
-                key, value = line.split('=', 1)
-                os.environ[key] = value
+from _env import load_env
+load_env(os.path.join(project_root, ".env"))
 
 # --- CONFIGURATION ---
 # Your GitHub personal access token (needs repo scope)
@@ -49,20 +81,169 @@ if not GITHUB_TOKEN or not GITHUB_REPO:
     print("❌ Error: GITHUB_TOKEN and GITHUB_REPO must be set in .env file", file=sys.stderr)
     sys.exit(1)
 
+# Files above this size are streamed to GitHub chunk-by-chunk instead
+# of being base64-encoded in one shot (which peaks at ~3x file size in
+# memory: raw bytes + base64 string + JSON-encoded body).
+STREAM_THRESHOLD = 5 * 1024 * 1024
+
+# Chunk size for streamed base64 encoding. Must be a multiple of 3 so
+# each chunk encodes without padding and the pieces concatenate into
+# one valid base64 string.
+B64_CHUNK_SIZE = 3 * 1024 * 1024
+
+def _iter_json_body(local_file_path, data):
+    """Yield the JSON request body, streaming the base64 file content.
+
+    base64 output never contains characters that need JSON escaping, so
+    the file can be encoded chunk-by-chunk straight into the body
+    without the full encoding ever living in one buffer.
+    """
+    head = json.dumps(data)
+    yield (head[:-1] + ', "content": "').encode('ascii')
+    with open(local_file_path, 'rb') as f:
+        _advise_sequential(f.fileno())
+        while True:
+            chunk = f.read(B64_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield b64encode(chunk)
+    yield b'"}'
+
+# Remembers the public URL of every blob we've uploaded, keyed by its
+# git blob sha, so re-posting identical bytes skips the network.
+UPLOAD_CACHE_PATH = os.path.expanduser("~/.cache/album3/uploaded.json")
+
+def _git_blob_sha(local_file_path, file_size):
+    """Compute the sha git/GitHub would assign this file's blob.
+
+    Git blob ids are sha1 over b"blob <size>\\0" + content, so this
+    matches what the contents API reports for the uploaded file.
+    """
+    digest = hashlib.sha1(b"blob %d\x00" % file_size)
+    with open(local_file_path, 'rb') as f:
+        while True:
+            chunk = f.read(1024 * 1024)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _read_upload_cache():
+    try:
+        with open(UPLOAD_CACHE_PATH) as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_SH)
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _record_upload(blob_sha, url):
+    os.makedirs(os.path.dirname(UPLOAD_CACHE_PATH), exist_ok=True)
+    with open(UPLOAD_CACHE_PATH, 'a+') as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        f.seek(0)
+        try:
+            cache = json.load(f)
+        except ValueError:
+            cache = {}
+        cache[blob_sha] = {"url": url, "ts": time.time()}
+        f.seek(0)
+        f.truncate()
+        json.dump(cache, f)
+
+def _wait_until_public(url):
+    """Probe the raw URL until GitHub's CDN actually serves it.
+
+    The contents API can return 201 a moment before the file is
+    globally available, and Instagram fetches the URL immediately —
+    a quick bounded HEAD probe avoids a failed container create.
+    """
+    import requests
+
+    delay = 0.2
+    for _ in range(5):
+        try:
+            if _get_session().head(url, allow_redirects=True).status_code == 200:
+                return True
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(delay)
+        delay *= 2
+    return False
+
+def _advise_sequential(fd):
+    """Tell the kernel we'll read this fd front to back.
+
+    POSIX_FADV_SEQUENTIAL doubles the readahead window, so disk reads
+    run ahead of the encode/send loop instead of stalling it. Best
+    effort: not available on all platforms/filesystems.
+    """
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+
+@lru_cache(maxsize=1)
+def _get_session():
+    """Build the shared HTTP session once (keep-alive + retries).
+
+    The auth headers are set on the session so every call (the
+    exists-check GET and the upload PUT) reuses one TLS connection to
+    api.github.com without rebuilding the headers dict each time.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter, Retry
+
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.3,
+                          status_forcelist=[429, 500, 502, 503, 504])
+    ))
+    session.headers["Authorization"] = f"token {GITHUB_TOKEN}"
+    session.headers["Accept"] = "application/vnd.github.v3+json"
+    return session
+
+@lru_cache(maxsize=1)
+def _get_remote_sha_map():
+    """Fetch the branch tree once and map repo paths to blob shas.
+
+    The contents GET for an existing file echoes the entire blob back
+    as base64 (~135 MB of JSON for a file near the 100 MB limit) just
+    to learn its sha. The git trees endpoint returns one small JSON
+    covering every path, and caching it makes repeat lookups in a
+    batch-upload loop free. Missing branch/empty repo maps to {}.
+    """
+    url = f"https://api.github.com/repos/{GITHUB_REPO}/git/trees/{GITHUB_BRANCH}"
+    response = _get_session().get(url, params={'recursive': '1'})
+    if response.status_code != 200:
+        return {}
+    return {entry['path']: entry['sha']
+            for entry in _json_loads(response).get('tree', [])
+            if entry.get('type') == 'blob'}
+
 def upload_to_github(local_file_path):
     """Upload a file to GitHub and return raw URL"""
-    
-    # Validate input file
-    if not os.path.exists(local_file_path):
+    import requests  # free after the first _get_session() call
+
+
+    # Validate input file with a single stat call (exists/isfile/getsize
+    # are three separate stat(2) syscalls for the same path)
+    try:
+        st = os.stat(local_file_path)
+    except FileNotFoundError:
         print(f"Error: File not found at '{local_file_path}'", file=sys.stderr)
         sys.exit(1)
-    
-    if not os.path.isfile(local_file_path):
+
+    if not stat.S_ISREG(st.st_mode):
         print(f"Error: '{local_file_path}' is not a file", file=sys.stderr)
         sys.exit(1)
-    
+
     # Check file size (GitHub limit is 100MB per file)
-    file_size = os.path.getsize(local_file_path)
+    file_size = st.st_size
     if file_size > 100 * 1024 * 1024:  # 100MB
         print(f"Error: File size ({file_size/1024/1024:.1f}MB) exceeds GitHub's 100MB limit", file=sys.stderr)
         sys.exit(1)
@@ -71,47 +252,81 @@ def upload_to_github(local_file_path):
     file_name = os.path.basename(local_file_path)
     file_path_in_repo = f"media/{file_name}"  # Organize in media folder
     
+    # Skip the network entirely when these exact bytes were already
+    # uploaded (re-posting the same media is a common workflow).
+    blob_sha = _git_blob_sha(local_file_path, file_size)
+    cached = _read_upload_cache().get(blob_sha)
+    if cached:
+        print(f"-> '{file_name}' unchanged since last upload; reusing cached URL.", file=sys.stderr)
+        return cached["url"]
+
     print(f"-> Uploading '{file_name}' ({file_size/1024/1024:.1f}MB) to GitHub...", file=sys.stderr)
     
     try:
-        # Read file content
-        with open(local_file_path, 'rb') as f:
-            file_content = f.read()
-        
-        # Encode file content for GitHub API
-        encoded_content = base64.b64encode(file_content).decode('utf-8')
-        
         # GitHub API URL
         api_url = f"https://api.github.com/repos/{GITHUB_REPO}/contents/{file_path_in_repo}"
-        
-        # Headers
-        headers = {
-            "Authorization": f"token {GITHUB_TOKEN}",
-            "Accept": "application/vnd.github.v3+json",
-            "Content-Type": "application/json"
-        }
-        
+
+        # The raw URL is deterministic, so it doesn't need to be read
+        # back out of the PUT response body.
+        raw_url = (f"https://raw.githubusercontent.com/"
+                   f"{GITHUB_REPO}/{GITHUB_BRANCH}/{quote(file_path_in_repo)}")
+
         # Request body
         data = {
             "message": f"Upload {file_name} via Album 3 Instagram automation",
-            "content": encoded_content,
             "branch": GITHUB_BRANCH
         }
-        
-        # Check if file already exists
-        response = requests.get(api_url, headers=headers)
-        if response.status_code == 200:
-            # File exists, update it
-            existing_file = response.json()
-            data["sha"] = existing_file["sha"]
-            data["message"] = f"Update {file_name} via Album 3 Instagram automation"
-        
+
+        # Kick off the exists-check lookup in the background so the file
+        # read + base64 encoding below overlaps the network round-trip.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            fut_sha = executor.submit(_get_remote_sha_map)
+
+            if file_size <= STREAM_THRESHOLD:
+                with open(local_file_path, 'rb') as f:
+                    _advise_sequential(f.fileno())
+                    if os.name == 'posix' and file_size > 0:
+                        # mmap supports the buffer protocol, so b64encode
+                        # reads straight from the page cache instead of
+                        # first copying file_size bytes into a Python
+                        # bytes object.
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                            data["content"] = b64encode(mm).decode('ascii')
+                    else:
+                        data["content"] = b64encode(f.read()).decode('ascii')
+
+            # Check if file already exists
+            existing_sha = fut_sha.result(timeout=30).get(file_path_in_repo)
+            if existing_sha:
+                # File exists, update it
+                data["sha"] = existing_sha
+                data["message"] = f"Update {file_name} via Album 3 Instagram automation"
+
         # Upload/create file
-        response = requests.put(api_url, headers=headers, json=data)
+        if file_size > STREAM_THRESHOLD:
+            # Stream the body so peak memory stays O(chunk) instead of
+            # O(file size); base64 work overlaps with the socket write.
+            response = _get_session().put(
+                api_url,
+                data=_iter_json_body(local_file_path, data),
+                headers={"Content-Type": "application/json"}
+            )
+        else:
+            body = orjson.dumps(data) if orjson else json.dumps(data).encode('ascii')
+            response = _get_session().put(
+                api_url,
+                data=body,
+                headers={"Content-Type": "application/json"}
+            )
         
         if response.status_code in [200, 201]:
-            result = response.json()
-            raw_url = result["content"]["download_url"]
+            result = _json_loads(response)
+            # Keep the cached tree current so repeat uploads in the same
+            # process (batch loops) see the new sha.
+            _get_remote_sha_map()[file_path_in_repo] = result["content"]["sha"]
+            _record_upload(blob_sha, raw_url)
+            if not _wait_until_public(raw_url):
+                print(f"-> Warning: raw URL not serving yet; Instagram may need a retry.", file=sys.stderr)
             print(f"-> File uploaded successfully.", file=sys.stderr)
             return raw_url
         else:
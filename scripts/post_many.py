@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+post_many.py - Upload and post several Instagram Stories concurrently.
+
+Usage:
+    python3 post_many.py <file1> <file2> [<file3> ...]
+
+Media type is inferred from the file extension (.mp4/.mov/.m4v ->
+VIDEO, everything else -> IMAGE). The Graph API calls run on an async
+httpx client so the status-poll waits of one story overlap the
+uploads of the others; a semaphore caps how many stories are in
+flight at once.
+
+Configuration:
+    Same .env variables as upload_and_post_story.py, plus the optional
+    'httpx' package: pip install httpx
+
+Examples:
+    python3 post_many.py clip1.mp4 clip2.mp4 cover.png
+"""
+
+import sys
+import os
+import asyncio
+
+# Auto-activate virtual environment if it exists
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+venv_python = os.path.join(project_root, "venv", "bin", "python3")
+
+# Only re-exec when we're genuinely outside any virtual environment
+# (see upload_and_post_story.py for the reasoning).
+if (os.path.exists(venv_python)
+        and os.path.realpath(sys.executable) != os.path.realpath(venv_python)
+        and sys.prefix == sys.base_prefix):
+    os.execv(venv_python, [venv_python] + sys.argv)
+
+# Load environment variables from .env file
+sys.path.append(script_dir)
+from _env import load_env
+load_env(os.path.join(project_root, ".env"))
+
+from _ig_common import GRAPH_BASE_URL, _backoff, build_media_payload, load_token
+
+# --- CONFIGURATION ---
+ACCESS_TOKEN = load_token()
+INSTAGRAM_ACCOUNT_ID = os.getenv("INSTAGRAM_ACCOUNT_ID")
+
+if not ACCESS_TOKEN or not INSTAGRAM_ACCOUNT_ID:
+    print("❌ Error: INSTAGRAM_ACCESS_TOKEN and INSTAGRAM_ACCOUNT_ID must be set in environment variables")
+    sys.exit(1)
+
+MEDIA_UPLOAD_URL = f"{GRAPH_BASE_URL}/{INSTAGRAM_ACCOUNT_ID}/media"
+MEDIA_PUBLISH_URL = f"{GRAPH_BASE_URL}/{INSTAGRAM_ACCOUNT_ID}/media_publish"
+
+VIDEO_EXTENSIONS = {'.mp4', '.mov', '.m4v'}
+
+def _media_type_for(path):
+    """Infer VIDEO/IMAGE from the file extension."""
+    ext = os.path.splitext(path)[1].lower()
+    return 'VIDEO' if ext in VIDEO_EXTENSIONS else 'IMAGE'
+
+async def upload_media(client, media_url, media_type, label):
+    """Create a STORIES media container; returns the container ID."""
+    data = build_media_payload('STORY', media_type, media_url)
+
+    response = await client.post(MEDIA_UPLOAD_URL,
+                                 params={'access_token': ACCESS_TOKEN},
+                                 data=data)
+    result = response.json()
+    if response.status_code != 200 or 'id' not in result:
+        print(f"❌ [{label}] Error uploading media: {result}")
+        return None
+
+    print(f"✅ [{label}] Container created: {result['id']}")
+    return result['id']
+
+async def check_media_status(client, container_id, media_type, label):
+    """Async twin of _ig_common.check_media_status (same backoff)."""
+    status_url = f"{GRAPH_BASE_URL}/{container_id}"
+
+    for delay in _backoff():
+        response = await client.get(status_url, params={
+            'access_token': ACCESS_TOKEN,
+            'fields': 'id,status_code'
+        })
+        response.raise_for_status()
+
+        result = response.json()
+        status_code = result.get('status_code')
+
+        if status_code is None and media_type == 'IMAGE':
+            return True
+        if status_code == 'FINISHED':
+            return True
+        elif status_code == 'IN_PROGRESS':
+            await asyncio.sleep(delay)
+            continue
+        elif status_code == 'FAILED':
+            print(f"❌ [{label}] Media processing failed: {result}")
+            return False
+        else:
+            print(f"⚠️ [{label}] Unknown status: {result}")
+            return 'id' in result
+
+    print(f"❌ [{label}] Timed out waiting for media processing.")
+    return False
+
+async def publish_story(client, container_id, label):
+    """Publish a finished container as a Story; returns the media ID."""
+    response = await client.post(MEDIA_PUBLISH_URL,
+                                 params={'access_token': ACCESS_TOKEN},
+                                 data={'creation_id': container_id})
+    result = response.json()
+    if response.status_code != 200 or 'id' not in result:
+        print(f"❌ [{label}] Error publishing story: {result}")
+        return None
+
+    print(f"🎉 [{label}] Story published! Media ID: {result['id']}")
+    return result['id']
+
+async def post_one(semaphore, client, local_file_path):
+    """Full pipeline for one file: GitHub upload -> create -> poll -> publish."""
+    label = os.path.basename(local_file_path)
+    media_type = _media_type_for(local_file_path)
+
+    async with semaphore:
+        # upload_to_github is synchronous (and shared with the one-shot
+        # scripts); run it on a worker thread so other stories progress
+        # while this one is uploading.
+        from github_uploader import upload_to_github
+        media_url = await asyncio.to_thread(upload_to_github, local_file_path)
+        print(f"🔗 [{label}] Public URL: {media_url}")
+
+        container_id = await upload_media(client, media_url, media_type, label)
+        if not container_id:
+            return None
+
+        if not await check_media_status(client, container_id, media_type, label):
+            return None
+
+        return await publish_story(client, container_id, label)
+
+async def post_many(paths, limit=3):
+    """Post every path as a Story, at most `limit` in flight at once.
+
+    Returns one result per path: the story ID, None on an API error,
+    or the exception that aborted that file's pipeline.
+    """
+    import httpx
+
+    semaphore = asyncio.Semaphore(limit)
+    async with httpx.AsyncClient(timeout=30.0,
+                                 limits=httpx.Limits(max_connections=8)) as client:
+        return await asyncio.gather(
+            *(post_one(semaphore, client, path) for path in paths),
+            return_exceptions=True
+        )
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 post_many.py <file1> [<file2> ...]")
+        sys.exit(1)
+
+    paths = sys.argv[1:]
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"❌ File not found: {path}")
+            sys.exit(1)
+
+    try:
+        import httpx  # noqa: F401 -- fail early with a clear message
+    except ImportError:
+        print("❌ post_many.py requires the 'httpx' package: pip install httpx")
+        print("   For single files, use upload_and_post_story.py instead.")
+        sys.exit(1)
+
+    print(f"📱 Posting {len(paths)} file(s) to Instagram Stories...")
+    results = asyncio.run(post_many(paths))
+
+    failures = 0
+    for path, result in zip(paths, results):
+        if isinstance(result, BaseException):
+            print(f"❌ {path}: {result}")
+            failures += 1
+        elif result is None:
+            failures += 1
+
+    if failures:
+        print(f"❌ {failures} of {len(paths)} stories failed.")
+        sys.exit(1)
+    print(f"🎉 All {len(paths)} stories published.")
+
+if __name__ == "__main__":
+    main()
@@ -29,13 +29,32 @@ Important Notes:
 """
 
 import requests
-import time
 import sys
 import os
+from functools import lru_cache
+from requests.adapters import HTTPAdapter, Retry
+
+from _ig_common import check_media_status as _check_media_status, build_media_payload, load_token
+
+@lru_cache(maxsize=1)
+def _get_session():
+    """Build the shared HTTP session once (keep-alive + retries).
+
+    Reusing one session keeps the TLS connection to graph.facebook.com
+    open across the upload/status/publish calls instead of paying a
+    fresh handshake for each one.
+    """
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.3,
+                          status_forcelist=[429, 500, 502, 503, 504])
+    ))
+    return session
 
 # --- CONFIGURATION ---
-# Read from environment variables
-ACCESS_TOKEN = os.getenv("INSTAGRAM_ACCESS_TOKEN")
+ACCESS_TOKEN = load_token()
 INSTAGRAM_ACCOUNT_ID = os.getenv("INSTAGRAM_ACCOUNT_ID")
 
 if not ACCESS_TOKEN or not INSTAGRAM_ACCOUNT_ID:
@@ -57,23 +76,12 @@ def upload_media(media_url, media_type):
     Step 1: Uploads media to Instagram and returns a container ID.
     """
     print("Step 1: Uploading media...")
-    
-    # Prepare the request payload
-    data = {
-        'media_type': media_type,
-        'media_url': media_url,
-    }
-    
-    # Add is_share_to_story parameter
-    if media_type == 'IMAGE':
-        data['is_share_to_story'] = True
-    elif media_type == 'VIDEO':
-        data['video_url'] = media_url
-        data['media_type'] = 'REELS'
-        data['is_share_to_story'] = True
-    
+
+    # Prepare the request payload (share-to-story templates)
+    data = build_media_payload('REEL', media_type, media_url)
+
     try:
-        response = requests.post(MEDIA_UPLOAD_URL, params={'access_token': ACCESS_TOKEN}, data=data)
+        response = _get_session().post(MEDIA_UPLOAD_URL, params={'access_token': ACCESS_TOKEN}, data=data)
         response.raise_for_status()
         
         result = response.json()
@@ -99,7 +107,7 @@ def publish_story(container_id):
     }
     
     try:
-        response = requests.post(MEDIA_PUBLISH_URL, params={'access_token': ACCESS_TOKEN}, data=data)
+        response = _get_session().post(MEDIA_PUBLISH_URL, params={'access_token': ACCESS_TOKEN}, data=data)
         response.raise_for_status()
         
         result = response.json()
@@ -119,31 +127,7 @@ def check_media_status(container_id):
     Optional: Check the status of uploaded media before publishing.
     """
     print(f"Step 1.5: Checking media status...")
-    
-    try:
-        response = requests.get(STATUS_URL.format(container_id=container_id), params={'access_token': ACCESS_TOKEN})
-        response.raise_for_status()
-        
-        result = response.json()
-        status_code = result.get('status_code')
-        
-        if status_code == 'FINISHED':
-            print("✅ Media is ready for publishing.")
-            return True
-        elif status_code == 'IN_PROGRESS':
-            print("⏳ Media is still processing. Waiting...")
-            time.sleep(5)
-            return check_media_status(container_id)
-        elif status_code == 'FAILED':
-            print(f"❌ Media processing failed: {result}")
-            return False
-        else:
-            print(f"⚠️ Unknown status: {result}")
-            return False
-            
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Error checking media status: {e}")
-        return False
+    return _check_media_status(_get_session(), container_id, ACCESS_TOKEN)
 
 def main():
     if len(sys.argv) != 3:
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+s3_uploader.py - Upload files to S3-compatible storage and return public URLs.
+
+Alternative media backend to github_uploader.py: the file goes out as
+raw bytes over a presigned PUT instead of base64-in-JSON, so there is
+no 33% encoding overhead on the wire, no base64 CPU cost, and no
+100 MB Contents-API ceiling. Works with AWS S3, Cloudflare R2,
+Backblaze B2 or anything else speaking the S3 API.
+
+Usage:
+    python s3_uploader.py <local_file_path>
+
+Configuration:
+    - S3_BUCKET: Bucket to upload into
+    - S3_PREFIX: Key prefix inside the bucket (default: media)
+    - S3_PUBLIC_BASE_URL: Public/CDN base URL the bucket is served from
+    - S3_ENDPOINT_URL: Optional custom endpoint (R2/B2/minio)
+    plus the usual AWS credentials/region understood by boto3.
+
+Requires the optional 'boto3' package: pip install boto3
+"""
+
+import sys
+import os
+
+# Auto-activate virtual environment if it exists
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+venv_python = os.path.join(project_root, "venv", "bin", "python3")
+
+# Only re-exec when we're genuinely outside any virtual environment
+# (see github_uploader.py for the reasoning).
+if (os.path.exists(venv_python)
+        and os.path.realpath(sys.executable) != os.path.realpath(venv_python)
+        and sys.prefix == sys.base_prefix):
+    os.execv(venv_python, [venv_python] + sys.argv)
+
+import mimetypes
+from urllib.parse import quote
+
+# Load environment variables from .env file
+sys.path.append(script_dir)
+from _env import load_env
+load_env(os.path.join(project_root, ".env"))
+
+# --- CONFIGURATION ---
+S3_BUCKET = os.getenv("S3_BUCKET")
+S3_PREFIX = os.getenv("S3_PREFIX", "media")
+S3_PUBLIC_BASE_URL = os.getenv("S3_PUBLIC_BASE_URL")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+
+def upload_to_s3(local_file_path):
+    """Upload a file via a presigned PUT and return its public URL."""
+    import requests
+
+    try:
+        import boto3
+    except ImportError:
+        print("❌ s3_uploader.py requires the 'boto3' package: pip install boto3", file=sys.stderr)
+        sys.exit(1)
+
+    if not S3_BUCKET or not S3_PUBLIC_BASE_URL:
+        print("❌ Error: S3_BUCKET and S3_PUBLIC_BASE_URL must be set in .env file", file=sys.stderr)
+        sys.exit(1)
+
+    if not os.path.isfile(local_file_path):
+        print(f"Error: File not found at '{local_file_path}'", file=sys.stderr)
+        sys.exit(1)
+
+    file_name = os.path.basename(local_file_path)
+    file_size = os.path.getsize(local_file_path)
+    key = f"{S3_PREFIX}/{file_name}"
+    content_type = mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+
+    print(f"-> Uploading '{file_name}' ({file_size/1024/1024:.1f}MB) to S3...", file=sys.stderr)
+
+    client = boto3.client('s3', endpoint_url=S3_ENDPOINT_URL)
+    url = client.generate_presigned_url(
+        'put_object',
+        Params={'Bucket': S3_BUCKET, 'Key': key, 'ContentType': content_type},
+        ExpiresIn=300
+    )
+
+    try:
+        # data= with a file object streams the body straight off disk;
+        # nothing is buffered or re-encoded in memory.
+        with open(local_file_path, 'rb') as f:
+            response = requests.put(url, data=f, headers={
+                'Content-Type': content_type,
+                'Content-Length': str(file_size)
+            })
+
+        if response.status_code not in [200, 201]:
+            print(f"Error uploading to S3: {response.status_code} - {response.text}", file=sys.stderr)
+            sys.exit(1)
+
+        print(f"-> File uploaded successfully.", file=sys.stderr)
+        return f"{S3_PUBLIC_BASE_URL.rstrip('/')}/{quote(key)}"
+
+    except requests.exceptions.RequestException as e:
+        print(f"Error: S3 upload request failed. Check your credentials and bucket.", file=sys.stderr)
+        print(f"Details: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python s3_uploader.py <local_file_path>", file=sys.stderr)
+        sys.exit(1)
+
+    # Upload and print only the URL to stdout (for piping)
+    print(upload_to_s3(sys.argv[1]))
+
+if __name__ == "__main__":
+    main()
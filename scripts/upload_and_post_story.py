@@ -28,29 +28,52 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
 venv_python = os.path.join(project_root, "venv", "bin", "python3")
 
-if os.path.exists(venv_python) and sys.executable != venv_python:
+# Only re-exec when we're genuinely outside any virtual environment:
+# sys.prefix == sys.base_prefix means no venv is active, and comparing
+# realpaths avoids a pointless exec when venv/bin/python3 is a symlink
+# to the interpreter already running. Each avoided exec saves a full
+# Python cold start (~100 ms).
+if (os.path.exists(venv_python)
+        and os.path.realpath(sys.executable) != os.path.realpath(venv_python)
+        and sys.prefix == sys.base_prefix):
     os.execv(venv_python, [venv_python] + sys.argv)
 
 # Now import the rest after venv is activated
 import requests
-import time
+import json
+from urllib.parse import urlencode
+from functools import lru_cache
+from requests.adapters import HTTPAdapter, Retry
+
+@lru_cache(maxsize=1)
+def _get_session():
+    """Build the shared HTTP session once (keep-alive + retries).
+
+    Reusing one session keeps the TLS connection to graph.facebook.com
+    open across the upload/status/publish calls instead of paying a
+    fresh handshake for each one. The lru_cache also means the venv
+    re-exec above doesn't pay the construction cost twice.
+    """
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.3,
+                          status_forcelist=[429, 500, 502, 503, 504])
+    ))
+    return session
 
 # Load environment variables from .env file
-env_file = os.path.join(project_root, ".env")
-if os.path.exists(env_file):
-    with open(env_file) as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#') and '=' in line:
-                key, value = line.split('=', 1)
-                os.environ[key] = value
-
-# Import the github uploader
 sys.path.append(script_dir)
-from github_uploader import upload_to_github
+from _env import load_env
+load_env(os.path.join(project_root, ".env"))
+
+# Import the shared Graph helpers (the github uploader is imported
+# lazily in main() so --help/bad-argv paths don't pay for it)
+from _ig_common import check_media_status as _check_media_status, graph_batch, build_media_payload, load_token
 
 # --- CONFIGURATION ---
-ACCESS_TOKEN = os.getenv("INSTAGRAM_ACCESS_TOKEN")
+ACCESS_TOKEN = load_token()
 INSTAGRAM_ACCOUNT_ID = os.getenv("INSTAGRAM_ACCOUNT_ID")
 
 if not ACCESS_TOKEN or not INSTAGRAM_ACCOUNT_ID:
@@ -70,18 +93,10 @@ def upload_media(media_url, media_type):
     print("Step 2: Uploading media to Instagram...")
 
     # Prepare the request payload
-    data = {}
-
-    # Add is_share_to_story parameter
-    if media_type == 'IMAGE':
-        data['media_type'] = 'STORIES'
-        data['image_url'] = media_url
-    elif media_type == 'VIDEO':
-        data['media_type'] = 'STORIES'
-        data['video_url'] = media_url
+    data = build_media_payload('STORY', media_type, media_url)
 
     try:
-        response = requests.post(MEDIA_UPLOAD_URL, params={'access_token': ACCESS_TOKEN}, data=data)
+        response = _get_session().post(MEDIA_UPLOAD_URL, params={'access_token': ACCESS_TOKEN}, data=data)
 
         result = response.json()
 
@@ -112,7 +127,7 @@ def publish_story(container_id):
     }
 
     try:
-        response = requests.post(MEDIA_PUBLISH_URL, params={'access_token': ACCESS_TOKEN}, data=data)
+        response = _get_session().post(MEDIA_PUBLISH_URL, params={'access_token': ACCESS_TOKEN}, data=data)
         response.raise_for_status()
 
         result = response.json()
@@ -127,51 +142,51 @@ def publish_story(container_id):
         print(f"❌ Network error publishing story: {e}")
         return None
 
-def check_media_status(container_id, media_type):
+def post_image_story_batch(media_url):
     """
-    Step 2.5: Check the status of uploaded media before publishing.
+    Steps 2+3 in one round-trip: create the container and publish it.
+
+    Image stories don't need a status poll, so the media create and
+    media_publish calls are linked into a single JSON-batch request
+    (the publish references the create's result via depends_on).
     """
-    print(f"Step 2.5: Checking media status...")
+    print("Step 2+3: Uploading and publishing image in one batched call...")
+
+    ops = [
+        {
+            'method': 'POST',
+            'name': 'create',
+            'relative_url': f'{INSTAGRAM_ACCOUNT_ID}/media',
+            'body': urlencode(build_media_payload('STORY', 'IMAGE', media_url))
+        },
+        {
+            'method': 'POST',
+            'relative_url': f'{INSTAGRAM_ACCOUNT_ID}/media_publish',
+            'body': 'creation_id={result=create:$.id}'
+        }
+    ]
+
+    results = graph_batch(_get_session(), ACCESS_TOKEN, ops)
+    if not results or len(results) != 2:
+        print(f"❌ Unexpected batch response: {results}")
+        return None
 
-    try:
-        response = requests.get(
-            STATUS_URL.format(container_id=container_id),
-            params={
-                'access_token': ACCESS_TOKEN,
-                'fields': 'id,status_code'
-            }
-        )
-        response.raise_for_status()
+    publish = results[1]
+    if publish and publish.get('code') == 200:
+        result = json.loads(publish['body'])
+        if 'id' in result:
+            print(f"✅ Story published successfully! Media ID: {result['id']}")
+            return result['id']
 
-        result = response.json()
-        status_code = result.get('status_code')
-
-        # For Stories with images, status_code might not be returned (immediate processing)
-        if status_code is None and media_type == 'IMAGE':
-            print("✅ Media is ready for publishing (Stories don't require status check).")
-            return True
-
-        if status_code == 'FINISHED':
-            print("✅ Media is ready for publishing.")
-            return True
-        elif status_code == 'IN_PROGRESS':
-            print("⏳ Media is still processing. Waiting...")
-            time.sleep(5)
-            return check_media_status(container_id, media_type)
-        elif status_code == 'FAILED':
-            print(f"❌ Media processing failed: {result}")
-            return False
-        else:
-            print(f"⚠️ Unknown status: {result}")
-            # For Stories, proceed anyway if we have an ID
-            if 'id' in result:
-                print("✅ Proceeding with publication...")
-                return True
-            return False
+    print(f"❌ Batched publish failed: {results}")
+    return None
 
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Error checking media status: {e}")
-        return False
+def check_media_status(container_id, media_type):
+    """
+    Step 2.5: Check the status of uploaded media before publishing.
+    """
+    print(f"Step 2.5: Checking media status...")
+    return _check_media_status(_get_session(), container_id, ACCESS_TOKEN, media_type)
 
 def main():
     if len(sys.argv) != 3:
@@ -193,30 +208,59 @@ def main():
     print(f"📱 Uploading and posting {media_type} to Instagram Story...")
     print(f"📁 Local file: {local_file_path}")
 
-    # Step 1: Upload to GitHub
+    # Step 1: Upload media to the hosting backend (github by default;
+    # set MEDIA_BACKEND=s3 for the presigned-PUT path in s3_uploader.py)
+    backend = os.getenv("MEDIA_BACKEND", "github").lower()
     try:
-        print("Step 1: Uploading to GitHub...")
-        media_url = upload_to_github(local_file_path)
-        print(f"✅ File uploaded to GitHub")
+        if backend == "s3":
+            print("Step 1: Uploading to S3...")
+            from s3_uploader import upload_to_s3 as upload_media_file
+        else:
+            print("Step 1: Uploading to GitHub...")
+            from github_uploader import upload_to_github as upload_media_file
+        media_url = upload_media_file(local_file_path)
+        print(f"✅ File uploaded to {backend}")
         print(f"🔗 Public URL: {media_url}")
     except Exception as e:
-        print(f"❌ Failed to upload to GitHub: {e}")
+        print(f"❌ Failed to upload to {backend}: {e}")
         sys.exit(1)
 
-    # Step 2: Upload media to Instagram
-    container_id = upload_media(media_url, media_type)
-
-    if not container_id:
-        print("❌ Failed to upload media to Instagram. Aborting.")
-        sys.exit(1)
+    if media_type == 'IMAGE':
+        # Steps 2+3: images don't need a status poll, so create and
+        # publish go out as one batched Graph call.
+        story_id = post_image_story_batch(media_url)
+    else:
+        # When a webhook URL is configured, start the listener before
+        # creating the container so a fast notification isn't missed.
+        use_webhook = bool(os.getenv("IG_WEBHOOK_URL"))
+        if use_webhook:
+            from webhook_listener import start_listener, wait_for_media_ready
+            start_listener()
+
+        # Step 2: Upload media to Instagram
+        container_id = upload_media(media_url, media_type)
+
+        if not container_id:
+            print("❌ Failed to upload media to Instagram. Aborting.")
+            sys.exit(1)
+
+        # Step 2.5: Wait for processing — push notification when the
+        # webhook is configured, status polling otherwise
+        if use_webhook:
+            print("Step 2.5: Waiting for media-ready webhook...")
+            ready = wait_for_media_ready(container_id)
+            if not ready:
+                print("⚠️ No webhook notification in time. Falling back to polling...")
+                ready = check_media_status(container_id, media_type)
+        else:
+            ready = check_media_status(container_id, media_type)
 
-    # Step 2.5: Check media status (important for videos)
-    if not check_media_status(container_id, media_type):
-        print("❌ Media is not ready for publishing. Aborting.")
-        sys.exit(1)
+        if not ready:
+            print("❌ Media is not ready for publishing. Aborting.")
+            sys.exit(1)
 
-    # Step 3: Publish as Story
-    story_id = publish_story(container_id)
+        # Step 3: Publish as Story
+        story_id = publish_story(container_id)
 
     if story_id:
         print(f"🎉 Success! Your Instagram Story has been published.")
@@ -0,0 +1,110 @@
+"""
+webhook_listener.py - Receive Graph API media webhooks instead of polling.
+
+Graph can push a notification the moment a media container finishes
+processing, which beats polling by up to a full poll interval per
+probe. Run this listener behind a public HTTPS tunnel (e.g. ngrok) and
+point the Meta app's webhook subscription at it;
+upload_and_post_story.py blocks on wait_for_media_ready() when
+IG_WEBHOOK_URL is set and falls back to polling otherwise.
+
+Configuration:
+    - IG_WEBHOOK_URL: public URL of this listener (enables push mode)
+    - IG_WEBHOOK_PORT: local port to bind (default: 8466)
+    - IG_WEBHOOK_VERIFY_TOKEN: token echoed during Meta's GET handshake
+    - FB_APP_SECRET: used to verify X-Hub-Signature-256 on payloads
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# One Event per media/container id; POSTs set them, waiters block on them.
+_events = {}
+_events_lock = threading.Lock()
+_server = None
+
+def _event_for(media_id):
+    with _events_lock:
+        return _events.setdefault(str(media_id), threading.Event())
+
+def _signature_ok(body, header):
+    """Verify Meta's X-Hub-Signature-256 HMAC over the raw body."""
+    app_secret = os.getenv("FB_APP_SECRET")
+    if not app_secret:
+        return False
+    expected = 'sha256=' + hmac.new(app_secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, header)
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        # Keep stdout clean; the scripts own the console output.
+        pass
+
+    def do_GET(self):
+        # Meta's subscription verification handshake: echo hub.challenge
+        # back when the verify token matches.
+        query = parse_qs(urlparse(self.path).query)
+        mode = query.get('hub.mode', [''])[0]
+        token = query.get('hub.verify_token', [''])[0]
+
+        if mode == 'subscribe' and token == os.getenv("IG_WEBHOOK_VERIFY_TOKEN", ''):
+            challenge = query.get('hub.challenge', [''])[0]
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(challenge.encode())
+        else:
+            self.send_response(403)
+            self.end_headers()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+
+        if not _signature_ok(body, self.headers.get('X-Hub-Signature-256', '')):
+            self.send_response(403)
+            self.end_headers()
+            return
+
+        # Acknowledge before processing so Meta doesn't retry.
+        self.send_response(200)
+        self.end_headers()
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return
+
+        for entry in payload.get('entry', []):
+            for change in entry.get('changes', []):
+                value = change.get('value', {})
+                media_id = value.get('media_id') or value.get('id')
+                if media_id:
+                    _event_for(media_id).set()
+
+def start_listener(port=None):
+    """Start the webhook server on a daemon thread (idempotent).
+
+    Call before creating the media container so a fast notification
+    can't slip past the listener.
+    """
+    global _server
+    if _server is None:
+        port = port or int(os.getenv("IG_WEBHOOK_PORT", "8466"))
+        _server = ThreadingHTTPServer(('', port), _WebhookHandler)
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+def wait_for_media_ready(container_id, timeout=300):
+    """Block until the webhook reports the container ready.
+
+    Returns True when the notification arrived, False on timeout (the
+    caller should fall back to polling).
+    """
+    start_listener()
+    return _event_for(container_id).wait(timeout)